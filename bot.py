@@ -14,6 +14,7 @@ import asyncio
 from datetime import datetime, timezone, timedelta
 from keep_alive import keep_alive
 from functools import partial
+from concurrent.futures import ThreadPoolExecutor
 from discord.ext import commands
 from discord import app_commands
 from dotenv import load_dotenv
@@ -65,9 +66,9 @@ from soundcloud_utils import (
     note_soundcloud_release_fetch
 )
 import soundcloud_utils  # added for dynamic key manager access
-from utils import run_blocking, log_release, parse_datetime, get_cache, set_cache, delete_cache, clear_all_cache, get_cache_stats
+from utils import CustomFormatter, run_blocking, log_release, parse_datetime, prune_expired_cache, aget_cache, aset_cache, aclear_all_cache, get_highest_quality_artwork
 from reset_artists import reset_tables
-from tables import initialize_fresh_database, initialize_cache_table, create_all_tables
+from tables import initialize_fresh_database, initialize_cache_table, create_all_tables, checkpoint_wal
 import sqlite3
 import signal
 import sys
@@ -86,22 +87,7 @@ try:
 except Exception as e:
     logging.error(f"❌ Failed ensuring database schema: {e}")
 
-# Configure logging with color-coded levels
-class CustomFormatter(logging.Formatter):
-    COLORS = {
-        "DEBUG": "\033[90m",  # Gray
-        "INFO": "\033[94m",  # Blue
-        "WARNING": "\033[93m",  # Orange
-        "ERROR": "\033[91m",  # Red
-        "CRITICAL": "\033[91m",  # Red
-    }
-    RESET = "\033[0m"
-
-    def format(self, record):
-        color = self.COLORS.get(record.levelname, self.RESET)
-        record.msg = f"{color}{record.msg}{self.RESET}"
-        return super().format(record)
-
+# Configure logging with color-coded levels (formatter shared from utils)
 logging.basicConfig(
     level=logging.INFO,
     format='%(asctime)s %(levelname)s: %(message)s',
@@ -220,6 +206,7 @@ load_dotenv()
 TOKEN = os.getenv("DISCORD_TOKEN")
 TEST_GUILD_ID = os.getenv("TEST_GUILD_ID")
 LOG_CHANNEL_ID = int(os.getenv("LOG_CHANNEL_ID", 0))
+THREAD_POOL_SIZE = int(os.getenv("THREAD_POOL_SIZE", "64"))
 
 # CATCH-UP CONFIGURATION
 CATCH_UP_THRESHOLD = timedelta(hours=24)  # Only catch up if downtime < 24 hours
@@ -234,6 +221,10 @@ class MusicBot(commands.Bot):
         self._health_task = None
     
     async def setup_hook(self):
+        # Pool for run_blocking / asyncio.to_thread (platform API + SQLite calls), sized for I/O
+        asyncio.get_running_loop().set_default_executor(
+            ThreadPoolExecutor(max_workers=THREAD_POOL_SIZE, thread_name_prefix="bot-io")
+        )
         if LOG_CHANNEL_ID:
             self.log_channel = self.get_channel(LOG_CHANNEL_ID)
         if TEST_GUILD_ID:
@@ -256,6 +247,12 @@ class MusicBot(commands.Bot):
                 try:
                     await asyncio.sleep(900)  # 15 minutes
                     await self.emit_health_log()
+                    # Expired cache rows are no longer deleted on read (kept as stale fallback)
+                    removed = await run_blocking(prune_expired_cache, datetime.now() - timedelta(hours=1))
+                    if removed:
+                        logging.info(f"🧹 Pruned {removed} expired cache rows")
+                    busy, wal_frames, _ = await run_blocking(checkpoint_wal)
+                    logging.debug(f"WAL checkpoint: frames={wal_frames} busy={busy}")
                 except asyncio.CancelledError:
                     break
                 except Exception as e:
@@ -513,8 +510,7 @@ async def check_for_playlist_changes(bot, artist, playlist_info):
         cover_url = playlist_info.get('cover_url')
         if cover_url:
             try:
-                from utils import get_highest_quality_artwork
-                high_res = get_highest_quality_artwork(cover_url)
+                high_res = get_highest_quality_artwork(cover_url)  # probe-free, no I/O
                 embed.set_thumbnail(url=high_res or cover_url)
             except Exception:
                 embed.set_thumbnail(url=cover_url)
@@ -756,7 +752,7 @@ async def check_spotify_updates(bot, artists, shutdown_time=None, is_catchup: bo
                 if _newer(api_dt, last_check_dt):
                     album_id = release_info.get('album_id')
                     cache_key_global = f"posted_spotify:{artist_id}:{album_id}:{api_release_date}"
-                    if get_cache(cache_key_global) or (album_id, api_release_date) in cycle_dedupe:
+                    if await aget_cache(cache_key_global) or (album_id, api_release_date) in cycle_dedupe:
                         logging.info("     ⏭️ Duplicate suppressed")
                     else:
                         heading_text, release_type_detected, embed = create_music_embed(
@@ -789,7 +785,7 @@ async def check_spotify_updates(bot, artists, shutdown_time=None, is_catchup: bo
                                 logging.error(f"      - guild id = {sub_gid} - send failed: {se}")
 
                         if posted_any:
-                            set_cache(cache_key_global, '1', ttl=86400)
+                            await aset_cache(cache_key_global, '1', ttl=86400)
                             cycle_dedupe.add((album_id, api_release_date))
                             releases += 1
                     update_last_release_check(artist_id, owner_id, guild_id, batch_check_time)
@@ -811,7 +807,7 @@ async def check_spotify_updates(bot, artists, shutdown_time=None, is_catchup: bo
                     album_id = feat_info.get('album_id')
                     feat_release_date = feat_info.get('release_date')
                     feat_key_global = f"posted_spotify:{artist_id}:{album_id}:{feat_release_date}"
-                    if get_cache(feat_key_global) or (album_id, feat_release_date) in cycle_dedupe:
+                    if await aget_cache(feat_key_global) or (album_id, feat_release_date) in cycle_dedupe:
                         return
 
                     heading_text, release_type, embed = create_music_embed(
@@ -856,7 +852,7 @@ async def check_spotify_updates(bot, artists, shutdown_time=None, is_catchup: bo
                         except Exception as se:
                             logging.error(f"      - featured send failed guild={sub_gid}: {se}")
                     if posted_any:
-                        set_cache(feat_key_global, '1', ttl=86400)
+                        await aset_cache(feat_key_global, '1', ttl=86400)
                         cycle_dedupe.add((album_id, feat_release_date))
                         releases += 1
             except Exception as e:
@@ -1372,7 +1368,7 @@ async def channels_command(interaction: discord.Interaction):
 async def reset_bot_command(interaction: discord.Interaction):
     try:
         # Clear cache
-        clear_all_cache()
+        await aclear_all_cache()
         initialize_fresh_database()
 
         # Reset activity tracking
@@ -1389,8 +1385,8 @@ async def reset_bot_command(interaction: discord.Interaction):
 @bot.tree.command(name="testcache", description="Test SQLite cache.")
 async def test_cache_command(interaction: discord.Interaction):
     try:
-        set_cache("test_key", "test_value", ttl=60)
-        value = get_cache("test_key")
+        await aset_cache("test_key", "test_value", ttl=60)
+        value = await aget_cache("test_key")
         await interaction.response.send_message(f"✅ Cache is working. Test value: {value}")
     except Exception as e:
         await interaction.response.send_message(f"❌ Cache error: {e}")
@@ -1,7 +1,7 @@
 import os, sqlite3, logging, json
 from datetime import datetime, timezone, timedelta
 from dateutil.parser import isoparse, parse as parse_datetime
-from tables import get_connection, DB_PATH
+from tables import get_connection, bulk_insert, DB_PATH, ACTIVITY_LOGS_INDEX_DEFS
 
 # ---------- Helpers ----------
 
@@ -349,6 +349,27 @@ def mark_posted_playlist(artist_id, guild_id, playlist_id):
         conn.execute("REPLACE INTO posted_playlists(artist_id, guild_id, playlist_id) VALUES (?,?,?)", (artist_id, str(guild_id), playlist_id))
 
 
+def _bulk_mark_posted(table, id_col, rows):
+    # INSERT OR IGNORE lets the composite PK do duplicate detection in one transaction
+    return bulk_insert(
+        table, ('artist_id', 'guild_id', id_col),
+        ((artist_id, str(guild_id), item_id) for artist_id, guild_id, item_id in rows),
+        batch=5000, verb="INSERT OR IGNORE"
+    )
+
+def bulk_mark_posted_likes(rows):
+    """Mark many (artist_id, guild_id, like_id) rows as posted; returns rows sent."""
+    return _bulk_mark_posted('posted_likes', 'like_id', rows)
+
+def bulk_mark_posted_reposts(rows):
+    """Mark many (artist_id, guild_id, repost_id) rows as posted; returns rows sent."""
+    return _bulk_mark_posted('posted_reposts', 'repost_id', rows)
+
+def bulk_mark_posted_playlists(rows):
+    """Mark many (artist_id, guild_id, playlist_id) rows as posted; returns rows sent."""
+    return _bulk_mark_posted('posted_playlists', 'playlist_id', rows)
+
+
 def store_playlist_state(artist_id, guild_id, playlist_id, tracks, title=None):
     """Persist playlist state. If title provided, store structured state (title + tracks) for change detection."""
     state_obj = {'title': title, 'tracks': tracks} if title else tracks
@@ -427,6 +448,9 @@ def _ensure_activity_logs_allows_pref_change():
             """)
             cur.execute("DROP TABLE activity_logs;")
             cur.execute("ALTER TABLE activity_logs_new RENAME TO activity_logs;")
+            # DROP TABLE took the old table's indexes with it
+            for ddl in ACTIVITY_LOGS_INDEX_DEFS:
+                cur.execute(ddl)
             cur.execute("COMMIT;")
             cur.execute("PRAGMA foreign_keys=ON;")
             logging.info("✅ activity_logs migration complete.")
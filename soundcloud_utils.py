@@ -1,17 +1,18 @@
 import os
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import re
 import time
-import sqlite3
 import asyncio
 import random
 from urllib.parse import urlparse
 from dotenv import load_dotenv
 from datetime import datetime, timezone, timedelta
 import logging
-from utils import get_cache, set_cache, delete_cache
+from utils import get_cache, set_cache, delete_cache, get_cache_keys, CustomFormatter
 import json
-from database_utils import DB_PATH, get_channel, save_api_key_state, load_api_key_state
+from database_utils import get_channel, save_api_key_state, load_api_key_state
 from dateutil.parser import parse as isoparse
 from functools import lru_cache
 import threading
@@ -1505,17 +1506,25 @@ def seconds_to_minutes_seconds(seconds):
     seconds = seconds % 60
     return f"{minutes}:{str(seconds).zfill(2)}"
 
-def safe_get(url, headers=None, retries=3):
-    for attempt in range(retries):
-        response = requests.get(url, headers=headers)
-        if response.status_code == 429:
-            retry_after = int(response.headers.get("Retry-After", 5))
-            print(f"Rate limited. Sleeping for {retry_after} seconds...")
-            time.sleep(retry_after)
-            continue
-        response.raise_for_status()
-        return response
-    return None
+# Keep-alive session for safe_get; 429/5xx backoff (honouring Retry-After) is handled
+# by urllib3's Retry inside the adapter instead of a Python sleep loop.
+_safe_get_session = requests.Session()
+_safe_get_session.mount("https://", HTTPAdapter(max_retries=Retry(
+    total=3,
+    backoff_factor=0.5,
+    status_forcelist=[429, 500, 502, 503, 504],
+    respect_retry_after_header=True,
+    allowed_methods=["GET", "HEAD"],
+    raise_on_status=False
+)))
+
+def safe_get(url, headers=None):
+    response = _safe_get_session.get(url, headers=headers, timeout=(3, 10))
+    if response.status_code == 429:
+        logging.warning(f"Rate limited after retries: {url}")
+        return None
+    response.raise_for_status()
+    return response
 
 def get_soundcloud_likes(artist_url: str) -> List[Dict[str, Any]]:
     """Wrapper returning likes as list; never raises."""
@@ -1537,22 +1546,6 @@ def rate_limited_request(url, headers=None):
     time.sleep(RATE_LIMIT_DELAY)  # Enforce delay between requests
     return safe_request(url, headers=headers)
 
-# Custom logging formatter for Railway logs
-class RailwayLogFormatter(logging.Formatter):
-    COLORS = {
-        "DEBUG": "\033[90m",  # Gray
-        "INFO": "\033[94m",  # Blue
-        "WARNING": "\033[93m",  # Orange
-        "ERROR": "\033[91m",  # Red
-    }
-    RESET = "\033[0m"
-
-    def format(self, record):
-        # Fixed mismatched bracket
-        color = self.COLORS.get(record.levelname, self.RESET)
-        record.msg = f"{color}{record.msg}{self.RESET}"
-        return super().format(record)
-
 # --- Release batch monitoring integration (silent rate limit / truncation) ---
 # We already have _ReleaseFetchMonitor; add helpers to reset and automatic rotation logic.
 
@@ -1603,10 +1596,7 @@ def clear_malformed_cache():
 def get_all_cache_keys():
     """Retrieve all cache keys from SQLite."""
     try:
-        with sqlite3.connect(DB_PATH) as conn:
-            cursor = conn.cursor()
-            cursor.execute("SELECT key FROM cache")
-            return [row[0] for row in cursor.fetchall()]
+        return get_cache_keys()
     except Exception as e:
         logging.error(f"❌ Error retrieving cache keys: {e}")
         return []
@@ -1627,7 +1617,7 @@ if os.getenv('LOG_JSON') == '1':
             return _json.dumps(payload, ensure_ascii=False)
     logging.getLogger().handlers[0].setFormatter(_JSONFormatter())
 else:
-    logging.getLogger().handlers[0].setFormatter(RailwayLogFormatter())
+    logging.getLogger().handlers[0].setFormatter(CustomFormatter())
 
 def determine_release_type(playlist_data, tracks_data):
     """Determine release type with priority system.
@@ -4,9 +4,18 @@ from dotenv import load_dotenv
 import spotipy
 import logging
 from spotipy.oauth2 import SpotifyClientCredentials
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import threading
 import json
 import random
+from utils import get_cache, set_cache, CustomFormatter
+import heapq
+from itertools import islice
+from functools import lru_cache
+from datetime import datetime, timezone
+from concurrent.futures import ThreadPoolExecutor
 
 # Load environment variables
 load_dotenv()
@@ -203,6 +212,37 @@ async def _spotify_batch_watchdog():
 
 rotation_lock = threading.Lock()
 
+# Shared keep-alive HTTP pool for every Spotify client (API + token endpoint).
+# Retry settings mirror spotipy's own defaults so error handling is unchanged.
+_spotify_session = requests.Session()
+_spotify_session.mount('https://', HTTPAdapter(
+    pool_connections=20,
+    pool_maxsize=50,
+    max_retries=Retry(
+        total=3,
+        connect=None,
+        read=False,
+        allowed_methods=frozenset(['GET', 'POST', 'PUT', 'DELETE']),
+        status=3,
+        backoff_factor=0.3,
+        status_forcelist=(429, 500, 502, 503, 504),
+    ),
+))
+
+# One client is shared by every worker thread on purpose. spotipy.Spotify holds no
+# lock, so threads never serialize on it; calls only contend for HTTP connections,
+# and the adapter above already allows 50 of them. Per-thread clients with their own
+# credentials would just fetch one token per thread and split the keep-alive pool.
+def _make_spotify_client(client_id, client_secret):
+    return spotipy.Spotify(
+        auth_manager=SpotifyClientCredentials(
+            client_id=client_id,
+            client_secret=client_secret,
+            requests_session=_spotify_session
+        ),
+        requests_session=_spotify_session
+    )
+
 class SpotifyKeyManager:
     def __init__(self, bot=None):
         self.bot = bot
@@ -348,12 +388,7 @@ def _patch_rate_limit_handling():
 
 def _rebuild_spotify_client(client_id, client_secret):
     global spotify
-    spotify = spotipy.Spotify(
-        auth_manager=SpotifyClientCredentials(
-            client_id=client_id,
-            client_secret=client_secret
-        )
-    )
+    spotify = _make_spotify_client(client_id, client_secret)
     logging.info(f"✅ Reinitialized Spotify client with key {client_id[:10]}…")
     _patch_rate_limit_handling()  # ensure monkeypatch applied after each rebuild
 
@@ -383,12 +418,7 @@ if 'spotify_key_manager' not in globals() or spotify_key_manager is None:
         # Fallback to original single credentials if manager not yet set up
         if SPOTIFY_KEYS:
             cid, sec = SPOTIFY_KEYS[0]
-            spotify = spotipy.Spotify(
-                auth_manager=SpotifyClientCredentials(
-                    client_id=cid,
-                    client_secret=sec
-                )
-            )
+            spotify = _make_spotify_client(cid, sec)
             _patch_rate_limit_handling()
         else:
             spotify = None
@@ -586,6 +616,114 @@ def _jittered_ttl(base: int, jitter: int) -> int:
     except Exception:
         return base
 
+# Compact JSON for cache payloads (smaller rows, less encode/decode work)
+def _dumps_compact(value) -> str:
+    return json.dumps(value, separators=(',', ':'), ensure_ascii=False)
+
+def _chunked(items, size: int):
+    # Yield successive lists of at most `size` items (Spotify batch endpoints cap at 50 ids)
+    it = iter(items)
+    while True:
+        chunk = list(islice(it, size))
+        if not chunk:
+            return
+        yield chunk
+
+def _get_artist_genres_cached(artist_ids) -> list:
+    """
+    Return combined genres for the given artists.
+    Genres change rarely, so each artist's list is cached for ~24h under
+    spotify_artist_genres:{id}; misses are fetched via the batched /v1/artists endpoint.
+    """
+    genres = []
+    misses = []
+    for aid in dict.fromkeys(i for i in artist_ids if i):
+        try:
+            cached = get_cache(f"spotify_artist_genres:{aid}")
+        except Exception:
+            cached = None
+        if cached is not None:
+            try:
+                genres.extend(json.loads(cached))
+                continue
+            except Exception:
+                pass
+        misses.append(aid)
+    for ids in _chunked(misses, 50):
+        try:
+            resp = safe_spotify_call(spotify.artists, ids)
+        except Exception:
+            continue
+        for ai in (resp or {}).get('artists') or []:
+            if not ai or not ai.get('id'):
+                continue
+            ai_genres = ai.get('genres', []) or []
+            genres.extend(ai_genres)
+            try:
+                set_cache(f"spotify_artist_genres:{ai['id']}", _dumps_compact(ai_genres), ttl=_jittered_ttl(86400, 3600))
+            except Exception:
+                pass
+    return genres
+
+# --- Stale-while-revalidate release caches ---
+# Entries are stored as {"fresh_until": epoch, "value": ...} with a hard TTL of
+# fresh + SWR_STALE_WINDOW. Stale hits are served immediately while a daemon
+# thread refreshes the entry, so bulk expiries never block a poll cycle.
+SWR_STALE_WINDOW = 900
+_swr_refreshing = set()
+_swr_lock = threading.Lock()
+
+def _swr_get(cache_key: str, allow_stale: bool = False):
+    """Return (value, is_stale) for a SWR cache entry; (None, False) on miss.
+    allow_stale also returns entries past their hard expiry (upstream-failure fallback)."""
+    try:
+        cached = get_cache(cache_key, allow_stale=allow_stale)
+        if not cached:
+            return None, False
+        wrapper = json.loads(cached)
+        return wrapper['value'], wrapper.get('fresh_until', 0) <= time.time()
+    except Exception:
+        return None, False
+
+def _swr_set(cache_key: str, value, fresh_ttl: int, stale_ttl: int = None):
+    if stale_ttl is None:
+        stale_ttl = _jittered_ttl(SWR_STALE_WINDOW, 120)
+    try:
+        payload = {'fresh_until': time.time() + fresh_ttl, 'value': value}
+        raw = _dumps_compact(payload)
+        set_cache(cache_key, raw, ttl=fresh_ttl + stale_ttl)
+    except Exception:
+        pass
+
+# Short-lived marker for "Spotify definitively has nothing here" so repeated
+# lookups (e.g. one artist tracked in many guilds) skip the API entirely.
+_NEG_CACHE = _dumps_compact({"_neg": True})
+
+def _cache_negative(cache_key: str):
+    try:
+        ttl = _jittered_ttl(180, 60)
+        set_cache(cache_key, _NEG_CACHE, ttl=ttl)
+    except Exception:
+        pass
+
+def _swr_revalidate(cache_key: str, refresh_fn, *args):
+    """Refresh a stale entry in the background (at most one refresh per key in flight)."""
+    with _swr_lock:
+        if cache_key in _swr_refreshing:
+            return
+        _swr_refreshing.add(cache_key)
+
+    def _run():
+        try:
+            refresh_fn(*args, force_refresh=True)
+        except Exception as e:
+            logging.debug(f"SWR refresh failed for {cache_key}: {e}")
+        finally:
+            with _swr_lock:
+                _swr_refreshing.discard(cache_key)
+
+    threading.Thread(target=_run, daemon=True).start()
+
 def _format_duration_ms(total_ms: int) -> str:
     if not total_ms:
         return "0:00"
@@ -695,6 +833,12 @@ def get_latest_album_id(artist_id, force_refresh: bool = False):
     new_id = get_spotify_latest_album_id(artist_id, force_refresh=force_refresh)
     if new_id:
         return new_id
+    # Known-empty artist (negative marker hit or just written): skip the legacy fetch
+    try:
+        if get_cache(f"spotify_latest_album_id:{artist_id}") == _NEG_CACHE:
+            return None
+    except Exception:
+        pass
 
     # Fallback legacy logic (mirrors original removed version)
     try:
@@ -721,89 +865,91 @@ def get_latest_album_id(artist_id, force_refresh: bool = False):
         logging.debug(f"Fallback get_latest_album_id error for {artist_id}: {e}")
         return None
 
-def get_release_info(release_id, force_refresh: bool = False):
-    """Fetch detailed release info (album or single) with caching & normalized fields."""
-    if not release_id:
-        return None
-    cache_key = f"spotify_release:{release_id}"
-    if not force_refresh:
-        try:
-            from utils import get_cache
-            cached = get_cache(cache_key)
-            if cached:
-                return json.loads(cached)
-        except Exception:
-            pass
-    try:
-        album = safe_spotify_call(spotify.album, release_id)
-        if not album:
-            return None
+def _build_release_info(album: dict, album_id: str) -> dict:
+    """Normalize a Spotify album payload into the shared release-info shape."""
+    main_artists = [artist['name'] for artist in album['artists']]
+    main_artist_ids = [artist['id'] for artist in album['artists']]
+    artist_name = ', '.join(main_artists)
+
+    title = album['name']
+    release_date = album['release_date']
+    cover_url = album['images'][0]['url'] if album.get('images') else None
+    track_items = album.get('tracks', {}).get('items', [])
+    track_count = album.get('total_tracks', len(track_items))
+
+    # Single pass: duration total + featured artists (O(1) main-artist lookups)
+    total_ms = 0
+    features_set = set()
+    main_set = frozenset(main_artists)
+    for track in track_items:
+        total_ms += track.get('duration_ms', 0)
+        features_set.update(a.get('name') for a in track.get('artists', ()) if a.get('name') not in main_set)
+    duration_min = _format_duration_ms(total_ms)
+    features_list = sorted(features_set)
+
+    # Determine release type similar logic used elsewhere
+    if track_count == 1:
+        release_type = 'single'
+    elif track_count <= 6:
+        release_type = 'ep'
+    else:
+        release_type = 'album'
 
-        main_artists = [artist['name'] for artist in album['artists']]
-        main_artist_ids = [artist['id'] for artist in album['artists']]
-        artist_name = ', '.join(main_artists)
-
-        title = album['name']
-        release_date = album['release_date']
-        cover_url = album['images'][0]['url'] if album.get('images') else None
-        track_items = album.get('tracks', {}).get('items', [])
-        track_count = album.get('total_tracks', len(track_items))
-
-        total_ms = sum(t.get('duration_ms', 0) for t in track_items)
-        duration_min = _format_duration_ms(total_ms)
-
-        features_set = set()
-        for track in track_items:
-            for a in track.get('artists', []):
-                if a.get('name') not in main_artists:
-                    features_set.add(a.get('name'))
-        features_list = sorted(features_set)
-
-        # Determine release type similar logic used elsewhere
-        if track_count == 1:
-            release_type = 'single'
-        elif track_count <= 6:
-            release_type = 'ep'
-        else:
-            release_type = 'album'
+    genres = album.get('genres', []) or []
+    # Augment with main artist genres (cached per artist, misses batched)
+    genres.extend(_get_artist_genres_cached(main_artist_ids))
+    genres = sorted(set(g for g in genres if g))
 
-        genres = album.get('genres', []) or []
-        # Augment with main artist genres
-        for mid in main_artist_ids:
-            try:
-                ai = safe_spotify_call(spotify.artist, mid)
-                if ai:
-                    genres.extend(ai.get('genres', []))
-            except Exception:
-                continue
-        genres = sorted(set(g for g in genres if g))
+    return {
+        "artist_name": artist_name,
+        "main_artist_name": artist_name,
+        "title": title,
+        "url": album['external_urls']['spotify'],
+        "release_date": release_date,
+        "cover_url": cover_url,
+        "track_count": track_count,
+        "duration": duration_min,
+        "features": features_list,          # list form (SoundCloud parity)
+        "features_str": ", ".join(features_list) if features_list else None,  # legacy convenience
+        "genres": genres,
+        "repost": False,
+        "album_id": album_id,
+        "type": release_type
+    }
 
-        result = {
-            "artist_name": artist_name,
-            "main_artist_name": artist_name,
-            "title": title,
-            "url": album['external_urls']['spotify'],
-            "release_date": release_date,
-            "cover_url": cover_url,
-            "track_count": track_count,
-            "duration": duration_min,
-            "features": features_list,          # list form (SoundCloud parity)
-            "features_str": ", ".join(features_list) if features_list else None,  # legacy convenience
-            "genres": genres,
-            "repost": False,
-            "album_id": release_id,
-            "type": release_type
-        }
-        try:
-            from utils import set_cache
-            set_cache(cache_key, json.dumps(result), ttl=_jittered_ttl(300, 60))
-        except Exception:
-            pass
+def _get_release_info_shared(album_id, force_refresh: bool = False, album: dict = None):
+    """
+    Canonical album-level release info, cached once under spotify_album:{album_id}
+    and shared by the direct, latest-release and featured lookups.
+    Pass an already-fetched `album` payload to skip the API call and seed the cache.
+    """
+    if not album_id:
+        return None
+    cache_key = f"spotify_album:{album_id}"
+    if album is None and not force_refresh:
+        cached, is_stale = _swr_get(cache_key)
+        if cached is not None:
+            if is_stale:
+                _swr_revalidate(cache_key, _get_release_info_shared, album_id)
+            return cached
+    try:
+        if album is None:
+            album = safe_spotify_call(spotify.album, album_id)
+            if not album:
+                # Spotify unreachable / rate limited: degrade to last known value
+                stale, _ = _swr_get(cache_key, allow_stale=True)
+                return stale
+        result = _build_release_info(album, album_id)
+        _swr_set(cache_key, result, _jittered_ttl(300, 60))
         return result
     except Exception as e:
-        logging.debug(f"Error fetching release info for {release_id}: {str(e)}")
+        logging.debug(f"Error fetching release info for {album_id}: {str(e)}")
         return None
 
+def get_release_info(release_id, force_refresh: bool = False):
+    """Fetch detailed release info (album or single) with caching & normalized fields."""
+    return _get_release_info_shared(release_id, force_refresh=force_refresh)
+
 def get_spotify_artist_latest_release_info(artist_id: str, force_refresh: bool = False):
     """
     Parity with SoundCloud's get_soundcloud_release_info:
@@ -814,32 +960,16 @@ def get_spotify_artist_latest_release_info(artist_id: str, force_refresh: bool =
         genres (list), repost(False), album_id, type (single|ep|album),
         main_artist_name
       }
-    Cached briefly; force_refresh bypasses cache (used to avoid 2‑cycle lag).
+    Only the artist→album id mapping is cached per artist (spotify_latest_album_id);
+    album data comes from the shared spotify_album cache.
+    force_refresh bypasses cache (used to avoid 2‑cycle lag).
     """
     if not artist_id:
         return None
-    cache_key = f"spotify_latest_release_info:{artist_id}"
-    if not force_refresh:
-        try:
-            from utils import get_cache
-            cached = get_cache(cache_key)
-            if cached:
-                return json.loads(cached)
-        except Exception:
-            pass
     album_id = get_spotify_latest_album_id(artist_id, force_refresh=force_refresh)
     if not album_id:
         return None
-    info = get_release_info(album_id, force_refresh=force_refresh)
-    if not info:
-        return None
-    # Already standardized in get_release_info enhancements below
-    try:
-        from utils import set_cache
-        set_cache(cache_key, json.dumps(info), ttl=_jittered_ttl(120, 30))
-    except Exception:
-        pass
-    return info
+    return _get_release_info_shared(album_id, force_refresh=force_refresh)
 
 def get_spotify_featured_release_info(artist_id: str, force_refresh: bool = False):
     """
@@ -847,13 +977,11 @@ def get_spotify_featured_release_info(artist_id: str, force_refresh: bool = Fals
     """
     cache_key = f"spotify_featured_release_info:{artist_id}"
     if not force_refresh:
-        try:
-            from utils import get_cache
-            cached = get_cache(cache_key)
-            if cached:
-                return json.loads(cached)
-        except Exception:
-            pass
+        cached, is_stale = _swr_get(cache_key)
+        if cached is not None:
+            if is_stale:
+                _swr_revalidate(cache_key, get_spotify_featured_release_info, artist_id)
+            return cached
     raw = get_latest_featured_release(artist_id)
     if not raw:
         return None
@@ -878,13 +1006,12 @@ def get_spotify_featured_release_info(artist_id: str, force_refresh: bool = Fals
         "album_id": raw.get("album_id"),
         "type": raw.get("type")
     }
-    try:
-        from utils import set_cache
-        set_cache(cache_key, json.dumps(norm), ttl=_jittered_ttl(180, 40))
-    except Exception:
-        pass
+    _swr_set(cache_key, norm, _jittered_ttl(180, 40))
     return norm
 
+_UNDATED = "0000-00-00"
+
+@lru_cache(maxsize=4096)
 def _parse_spotify_date_str(s: str) -> str:
     # Normalize Spotify release_date to YYYY-MM-DD (fills month/day when missing)
     if not s:
@@ -901,6 +1028,18 @@ def _parse_spotify_date_str(s: str) -> str:
     except Exception:
         return s
 
+# Candidate albums are fetched in small newest-first waves so a match on the newest
+# album costs at most one wave of requests. The shared pool (like utils._ART_EXECUTOR)
+# is sized so every concurrently checked artist can run a full wave.
+FEATURED_FETCH_WAVE = 2
+_FEATURED_EXECUTOR = ThreadPoolExecutor(
+    max_workers=int(os.getenv("SPOTIFY_CHECK_CONCURRENCY", "10")) * FEATURED_FETCH_WAVE,
+    thread_name_prefix="spotify-featured"
+)
+
+# How long the last successful featured lookup is kept as an outage fallback
+FEATURED_LAST_GOOD_TTL = 86400
+
 def get_latest_featured_release(artist_id: str):
     """
     Find the latest release where this artist appears as a feature (not the main album artist).
@@ -910,6 +1049,13 @@ def get_latest_featured_release(artist_id: str):
       - type ('single'|'ep'|'album')
       - features (string with tracked artist underlined first)
     """
+    neg_key = f"spotify_latest_featured_neg:{artist_id}"
+    last_good_key = f"spotify_latest_featured_last:{artist_id}"
+    try:
+        if get_cache(neg_key) == _NEG_CACHE:
+            return None
+    except Exception:
+        pass
     try:
         # Fetch recent albums/singles this artist appears on
         albums_resp = safe_spotify_call(
@@ -918,7 +1064,15 @@ def get_latest_featured_release(artist_id: str):
             include_groups="appears_on,single,album,compilation",
             limit=20
         )
-        if not albums_resp or not albums_resp.get('items'):
+        if albums_resp is None:
+            # Spotify unreachable / rate limited: degrade to last known featured release
+            try:
+                stale = get_cache(last_good_key, allow_stale=True)
+                return json.loads(stale) if stale else None
+            except Exception:
+                return None
+        if not albums_resp.get('items'):
+            _cache_negative(neg_key)
             return None
 
         candidates = []
@@ -929,108 +1083,121 @@ def get_latest_featured_release(artist_id: str):
             # Skip if this is primarily the tracked artist (we only want external features)
             if main_album_artist_id == artist_id:
                 continue
-            # Quick normalized date
-            rel_date_norm = _parse_spotify_date_str(alb.get('release_date'))
-            candidates.append((rel_date_norm or "0000-00-00", alb_id))
+            # Quick normalized date (undated albums sort last)
+            candidates.append((_parse_spotify_date_str(alb.get('release_date')) or _UNDATED, alb_id))
 
         if not candidates:
+            _cache_negative(neg_key)
             return None
 
-        # Sort newest first
-        candidates.sort(key=lambda x: x[0], reverse=True)
-
-        # Inspect candidates to confirm the tracked artist appears on any track
-        for _, album_id in candidates[:10]:
-            album = safe_spotify_call(spotify.album, album_id)
-            if not album:
-                continue
-
-            tracks_resp = album.get('tracks') or {}
-            items = tracks_resp.get('items') or []
-            appears_on_any_track = False
-            all_artists_set = set()
-            for tr in items:
-                for a in tr.get('artists', []):
-                    all_artists_set.add(a['name'])
-                    if a.get('id') == artist_id:
-                        appears_on_any_track = True
-            if not appears_on_any_track:
-                continue
-
-            # Compute duration and track count
-            total_ms = sum(t.get('duration_ms', 0) for t in items)
-            minutes, seconds = divmod(total_ms // 1000, 60)
-            duration_min = f"{minutes}:{seconds:02d}"
-            track_count = album.get('total_tracks', len(items))
-
-            # Determine release type
-            if track_count == 1:
-                release_type = 'single'
-            elif track_count <= 6:
-                release_type = 'ep'
-            else:
-                release_type = 'album'
-
-            # Main artist displayed for "By"
-            main_artists = [a['name'] for a in (album.get('artists') or [])]
-            main_artist_name = ", ".join(main_artists) if main_artists else "Unknown"
-
-            # Build features text with tracked artist first and underlined
-            tracked_name = None
-            # Try to resolve tracked artist name via artist() endpoint
-            try:
-                ar_info = safe_spotify_call(spotify.artist, artist_id)
-                if ar_info and ar_info.get('name'):
-                    tracked_name = ar_info['name']
-            except Exception:
-                pass
-            # Create features list (exclude main artists to avoid duplication)
-            features_names = sorted(list(all_artists_set - set(main_artists)))
-            if tracked_name and tracked_name not in features_names:
-                features_names.insert(0, tracked_name)
-            elif tracked_name:
-                # Ensure tracked is first
-                features_names = [n for n in features_names if n != tracked_name]
-                features_names.insert(0, tracked_name)
-            # Underline tracked artist in output
-            features_text = None
-            if features_names:
-                features_text = ", ".join([f"__{features_names[0]}__"] + features_names[1:])
-
-            # Genres: combine album + main artist genres
-            genres = album.get('genres', []) or []
-            for a in (album.get('artists') or []):
+        # Inspect the 10 newest candidates to confirm the tracked artist appears on any track,
+        # stopping at the first wave that contains a match.
+        candidate_ids = [album_id for _, album_id in heapq.nlargest(10, candidates, key=lambda x: x[0])]
+        all_fetched = True
+        for i in range(0, len(candidate_ids), FEATURED_FETCH_WAVE):
+            wave = candidate_ids[i:i + FEATURED_FETCH_WAVE]
+            albums = list(_FEATURED_EXECUTOR.map(lambda aid: safe_spotify_call(spotify.album, aid), wave))
+            all_fetched = all_fetched and all(album is not None for album in albums)
+            found = _first_featured_album(artist_id, zip(wave, albums))
+            if found is not None:
+                # Last good result, only read back as the outage fallback above
                 try:
-                    ai = safe_spotify_call(spotify.artist, a['id'])
-                    if ai:
-                        genres.extend(ai.get('genres', []))
+                    set_cache(last_good_key, _dumps_compact(found), ttl=_jittered_ttl(FEATURED_LAST_GOOD_TTL, 3600))
                 except Exception:
-                    continue
-            genres = list(sorted(set(g for g in genres if g)))
-
-            cover_url = album['images'][0]['url'] if album.get('images') else None
-
-            return {
-                "album_id": album_id,
-                "artist_name": main_artist_name,     # used for "By" field
-                "title": album.get('name'),
-                "url": album['external_urls']['spotify'],
-                "release_date": _parse_spotify_date_str(album.get('release_date')),
-                "cover_url": cover_url,
-                "track_count": track_count,
-                "duration": duration_min,
-                "features": features_text,           # pre-formatted with tracked underlined
-                "genres": genres,
-                "repost": False,
-                "type": release_type,
-                "main_artist_name": main_artist_name
-            }
-
+                    pass
+                return found
+        # Only a definitive miss (every candidate fetched fine) is cached as negative
+        if all_fetched:
+            _cache_negative(neg_key)
         return None
     except Exception as e:
         logging.error(f"Error fetching latest featured release for artist {artist_id}: {e}")
         return None
 
+def _first_featured_album(artist_id: str, albums):
+    """Build the featured-release dict for the first (album_id, album) pair featuring artist_id."""
+    for album_id, album in albums:
+        if not album:
+            continue
+
+        tracks_resp = album.get('tracks') or {}
+        items = tracks_resp.get('items') or []
+        appears_on_any_track = False
+        all_artists_set = set()
+        for tr in items:
+            for a in tr.get('artists', []):
+                all_artists_set.add(a['name'])
+                if a.get('id') == artist_id:
+                    appears_on_any_track = True
+        if not appears_on_any_track:
+            continue
+
+        # Album-level fields come from the shared cache (seeded with this payload)
+        shared = _get_release_info_shared(album_id, album=album) or {}
+        track_count = shared.get('track_count', album.get('total_tracks', len(items)))
+        release_type = shared.get('type') or 'album'
+
+        # Main artist displayed for "By"
+        main_artists = [a['name'] for a in (album.get('artists') or [])]
+        main_artist_name = ", ".join(main_artists) if main_artists else "Unknown"
+
+        # Build features text with tracked artist first and underlined
+        tracked_name = None
+        # Try to resolve tracked artist name via artist() endpoint
+        try:
+            ar_info = safe_spotify_call(spotify.artist, artist_id)
+            if ar_info and ar_info.get('name'):
+                tracked_name = ar_info['name']
+        except Exception:
+            pass
+        # Create features list (exclude main artists to avoid duplication)
+        features_names = sorted(list(all_artists_set - set(main_artists)))
+        if tracked_name and tracked_name not in features_names:
+            features_names.insert(0, tracked_name)
+        elif tracked_name:
+            # Ensure tracked is first
+            features_names = [n for n in features_names if n != tracked_name]
+            features_names.insert(0, tracked_name)
+        # Underline tracked artist in output
+        features_text = None
+        if features_names:
+            features_text = ", ".join([f"__{features_names[0]}__"] + features_names[1:])
+
+        return {
+            "album_id": album_id,
+            "artist_name": main_artist_name,     # used for "By" field
+            "title": album.get('name'),
+            "url": album['external_urls']['spotify'],
+            "release_date": _parse_spotify_date_str(album.get('release_date')),
+            "cover_url": shared.get('cover_url'),
+            "track_count": track_count,
+            "duration": shared.get('duration'),
+            "features": features_text,           # pre-formatted with tracked underlined
+            "genres": shared.get('genres') or [],
+            "repost": False,
+            "type": release_type,
+            "main_artist_name": main_artist_name
+        }
+
+    return None
+
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+# release_date_precision -> anchored UTC datetime (fromisoformat is C-accelerated)
+_PREC_HANDLERS = {
+    'day': lambda s: datetime.fromisoformat(s[:10]).replace(tzinfo=timezone.utc, hour=12),
+    'month': lambda s: datetime(int(s[:4]), int(s[5:7]), 1, 12, tzinfo=timezone.utc),
+    'year': lambda s: datetime(int(s[:4]), 7, 1, 12, tzinfo=timezone.utc),
+}
+
+def _guess_spotify_precision(date_str: str) -> str:
+    if len(date_str) == 7 and date_str.count('-') == 1:
+        return 'month'
+    if len(date_str) == 4:
+        return 'year'
+    return 'day'
+
+@lru_cache(maxsize=4096)
 def _parse_spotify_date_for_compare(date_str: str, precision: str | None):
     """
     Convert Spotify release_date + precision into a comparable UTC datetime.
@@ -1038,26 +1205,15 @@ def _parse_spotify_date_for_compare(date_str: str, precision: str | None):
       day   -> that day 12:00 UTC
       month -> first day of month 12:00 UTC
       year  -> July 1 12:00 UTC (mid-year)
+    Memoized: the same release dates are re-scanned every poll cycle.
     """
-    from datetime import datetime, timezone
     if not date_str:
-        return datetime(1970, 1, 1, tzinfo=timezone.utc)
+        return _EPOCH
     try:
-        if precision == 'day' or (len(date_str) == 10 and date_str.count('-') == 2):
-            base = datetime.strptime(date_str[:10], "%Y-%m-%d")
-            return base.replace(tzinfo=timezone.utc, hour=12)
-        if precision == 'month' or (len(date_str) == 7 and date_str.count('-') == 1):
-            base = datetime.strptime(date_str[:7], "%Y-%m")
-            return base.replace(tzinfo=timezone.utc, day=1, hour=12)
-        if precision == 'year' or len(date_str) == 4:
-            base = datetime.strptime(date_str[:4], "%Y")
-            return base.replace(tzinfo=timezone.utc, month=7, day=1, hour=12)
-        # Fallback: try full date
-        base = datetime.strptime(date_str[:10], "%Y-%m-%d")
-        return base.replace(tzinfo=timezone.utc, hour=12)
+        handler = _PREC_HANDLERS.get(precision) or _PREC_HANDLERS[_guess_spotify_precision(date_str)]
+        return handler(date_str)
     except Exception:
-        from datetime import datetime, timezone
-        return datetime(1970, 1, 1, tzinfo=timezone.utc)
+        return _EPOCH
 
 def get_spotify_latest_album_id(artist_id: str, force_refresh: bool = False):
     """
@@ -1065,7 +1221,7 @@ def get_spotify_latest_album_id(artist_id: str, force_refresh: bool = False):
     - Fetch up to 50 items (album + single)
     - Parse release_date with precision
     - Select max comparable datetime
-    Cached briefly (120s).
+    Cached briefly (~120s, jittered).
     """
     if not artist_id or str(artist_id).lower() in ("none", "null", ""):
         logging.error("❌ get_spotify_latest_album_id called with invalid artist_id")
@@ -1073,10 +1229,9 @@ def get_spotify_latest_album_id(artist_id: str, force_refresh: bool = False):
     cache_key = f"spotify_latest_album_id:{artist_id}"
     if not force_refresh:
         try:
-            from utils import get_cache
             cached = get_cache(cache_key)
             if cached:
-                return cached
+                return None if cached == _NEG_CACHE else cached
         except Exception:
             pass
     try:
@@ -1086,8 +1241,16 @@ def get_spotify_latest_album_id(artist_id: str, force_refresh: bool = False):
             include_groups="album,single",
             limit=50
         )
-        items = (releases or {}).get('items', []) if releases else []
+        if releases is None:
+            # Spotify unreachable / rate limited: degrade to last known album id
+            try:
+                stale = get_cache(cache_key, allow_stale=True)
+                return None if stale == _NEG_CACHE else stale
+            except Exception:
+                return None
+        items = releases.get('items', [])
         if not items:
+            _cache_negative(cache_key)
             return None
         best = None
         for alb in items:
@@ -1100,11 +1263,12 @@ def get_spotify_latest_album_id(artist_id: str, force_refresh: bool = False):
             if best is None or cmp_dt > best[0]:
                 best = (cmp_dt, rid)
         if not best:
+            _cache_negative(cache_key)
             return None
         latest_id = best[1]
         try:
-            from utils import set_cache
-            set_cache(cache_key, latest_id, ttl=120)
+            ttl = _jittered_ttl(120, 30)
+            set_cache(cache_key, latest_id, ttl=ttl)
         except Exception:
             pass
         return latest_id
@@ -1114,20 +1278,5 @@ def get_spotify_latest_album_id(artist_id: str, force_refresh: bool = False):
 
 import logging
 
-# Custom logging formatter for Railway logs
-class RailwayLogFormatter(logging.Formatter):
-    COLORS = {
-        "DEBUG": "\033[90m",  # Gray
-        "INFO": "\033[94m",  # Blue
-        "WARNING": "\033[93m",  # Orange
-        "ERROR": "\033[91m",  # Red
-    }
-    RESET = "\033[0m"
-
-    def format(self, record):
-        color = self.COLORS.get(record.levelname, self.RESET)
-        record.msg = f"{color}{record.msg}{self.RESET}"
-        return super().format(record)
-
 logging.basicConfig(level=logging.INFO, format='%(asctime)s %(levelname)s: %(message)s')
-logging.getLogger().handlers[0].setFormatter(RailwayLogFormatter())
\ No newline at end of file
+logging.getLogger().handlers[0].setFormatter(CustomFormatter())
\ No newline at end of file
@@ -7,8 +7,56 @@ DB_PATH = "/data/artists.db"
 # Ensure directory exists
 os.makedirs(os.path.dirname(DB_PATH), exist_ok=True)
 
+# journal_mode=WAL is persisted in the database file, so it only needs setting once
+# per process. Connections are opened per helper call, so only the two PRAGMAs that
+# matter for a short-lived connection are applied on every open.
+_wal_enabled = False
+
 def get_connection():
-    return sqlite3.connect(DB_PATH)
+    global _wal_enabled
+    conn = sqlite3.connect(DB_PATH)
+    if not _wal_enabled:
+        try:
+            conn.execute("PRAGMA journal_mode=WAL")
+            _wal_enabled = True
+        except sqlite3.Error as e:
+            logging.warning(f"Could not enable WAL mode: {e}")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute("PRAGMA busy_timeout=5000")
+    return conn
+
+# The cache lives in its own database: losing recent cache writes on a crash is
+# harmless, so it runs with synchronous=OFF and autocommit without touching the
+# durability settings of the main database.
+CACHE_DB_PATH = "/data/cache.db"
+
+CACHE_SCHEMA_SQL = """
+CREATE TABLE IF NOT EXISTS cache (
+    key TEXT PRIMARY KEY,
+    value TEXT,
+    expires_at INTEGER
+);
+CREATE INDEX IF NOT EXISTS idx_cache_expires ON cache(expires_at) WHERE expires_at IS NOT NULL;
+"""
+
+def get_cache_connection():
+    conn = sqlite3.connect(CACHE_DB_PATH, isolation_level=None, check_same_thread=False, cached_statements=256)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=OFF")
+    conn.execute("PRAGMA temp_store=MEMORY")
+    conn.execute("PRAGMA cache_size=-32768")
+    conn.execute("PRAGMA busy_timeout=5000")
+    conn.executescript(CACHE_SCHEMA_SQL)
+    return conn
+
+def checkpoint_wal():
+    """Fold the WAL back into the main database and truncate it so it can't grow unbounded.
+    Returns (busy, wal_frames, checkpointed_frames) as reported by SQLite."""
+    conn = get_connection()
+    try:
+        return conn.execute("PRAGMA wal_checkpoint(TRUNCATE)").fetchone()
+    finally:
+        conn.close()
 
 # Core schema definition (idempotent)
 TABLE_DEFS = [
@@ -74,11 +122,6 @@ TABLE_DEFS = [
         timestamp TEXT,
         details TEXT
     )"""),
-    ("cache", """CREATE TABLE IF NOT EXISTS cache (
-        key TEXT PRIMARY KEY,
-        value TEXT,
-        expires_at TEXT
-    )"""),
     ("api_keys", """CREATE TABLE IF NOT EXISTS api_keys (
         platform TEXT,
         key_index INTEGER,
@@ -104,23 +147,82 @@ TABLE_DEFS = [
     )"""),
 ]
 
+# Serves the action filter + ORDER BY timestamp of the last startup/shutdown lookups;
+# kept separate so the activity_logs rebuild can recreate exactly these
+ACTIVITY_LOGS_INDEX_DEFS = [
+    "CREATE INDEX IF NOT EXISTS idx_activity_logs_action_ts ON activity_logs(action, timestamp)",
+]
+
+# Indexes are created after the tables (and after any bulk load) in the same script
+INDEX_DEFS = [
+    # artists PK leads with platform, so artist_id/owner_id lookups and per-guild scans can't use it
+    "CREATE INDEX IF NOT EXISTS idx_artists_artist_owner ON artists(artist_id, owner_id, guild_id)",
+    "CREATE INDEX IF NOT EXISTS idx_artists_guild ON artists(guild_id)",
+    *ACTIVITY_LOGS_INDEX_DEFS,
+    # Serves the platform filter + ORDER BY timestamp of the recent-rotation lookup
+    "CREATE INDEX IF NOT EXISTS idx_api_key_rotations_platform_ts ON api_key_rotations(platform, timestamp)",
+]
+
+SCHEMA_SQL = ";\n".join([ddl for _, ddl in TABLE_DEFS] + INDEX_DEFS) + ";"
+
 def drop_all_tables():
+    # Enumerate sqlite_master so tables outside TABLE_DEFS are dropped too; one transaction
     with get_connection() as conn:
-        cur = conn.cursor()
-        for name, _ in TABLE_DEFS:
-            cur.execute(f"DROP TABLE IF EXISTS {name}")
-        conn.commit()
+        names = [name for (name,) in conn.execute(
+            "SELECT name FROM sqlite_master WHERE type='table' AND name NOT LIKE 'sqlite_%'"
+        )]
+        try:
+            conn.executescript(
+                "BEGIN;\n"
+                + "".join(f'DROP TABLE IF EXISTS "{name}";\n' for name in names)
+                + "COMMIT;"
+            )
+        except sqlite3.Error as e:
+            conn.rollback()
+            logging.error(f"Failed dropping tables {names}: {e}")
+            raise
+    # The cache lives in CACHE_DB_PATH; wipe it too so posted_* dedupe markers and
+    # release info don't survive a reset
+    cache = get_cache_connection()
+    try:
+        cache.execute("DELETE FROM cache")
+    finally:
+        cache.close()
 
 def create_all_tables():
+    # One executescript call inside one transaction: single parse pass and a single
+    # commit/fsync instead of a Python round trip + autocommit per DDL
     with get_connection() as conn:
-        cur = conn.cursor()
-        for _, ddl in TABLE_DEFS:
-            cur.execute(ddl)
+        conn.executescript("BEGIN;\n" + SCHEMA_SQL + "\nCOMMIT;")
+    migrate_legacy_cache()
+
+# Legacy rows stored expires_at as local-time ISO text; 'utc' converts that to epoch seconds
+LEGACY_CACHE_SELECT_SQL = """
+SELECT key, value, exp FROM (
+    SELECT key, value, expires_at,
+           CASE WHEN typeof(expires_at) = 'integer' THEN expires_at
+                ELSE CAST(strftime('%s', expires_at, 'utc') AS INTEGER) END AS exp
+    FROM cache
+) WHERE expires_at IS NULL OR exp > CAST(strftime('%s', 'now') AS INTEGER)
+"""
+
+def migrate_legacy_cache():
+    """Copy unexpired rows from the cache table in the main database into CACHE_DB_PATH
+    (expires_at as epoch seconds), then drop the legacy table. No-op once migrated."""
+    with get_connection() as conn:
+        if not conn.execute("SELECT 1 FROM sqlite_master WHERE type='table' AND name='cache'").fetchone():
+            return
+        rows = conn.execute(LEGACY_CACHE_SELECT_SQL).fetchall()
+        cache_conn = get_cache_connection()
         try:
-            cur.execute("CREATE INDEX IF NOT EXISTS idx_cache_expires_at ON cache(expires_at)")
-        except Exception:
-            pass
-        conn.commit()
+            # Entries already written to the new cache are newer; keep them
+            cache_conn.execute("BEGIN")
+            cache_conn.executemany("INSERT OR IGNORE INTO cache (key, value, expires_at) VALUES (?, ?, ?)", rows)
+            cache_conn.execute("COMMIT")
+        finally:
+            cache_conn.close()
+        conn.execute("DROP TABLE cache")
+    logging.info(f"✅ Migrated {len(rows)} cache rows to {CACHE_DB_PATH}")
 
 # Remove incorrect migration that referenced a different DB and non-existent column
 
@@ -129,11 +231,27 @@ def initialize_fresh_database():
     create_all_tables()
 
 def initialize_cache_table():
-    with get_connection() as conn:
-        conn.execute("CREATE TABLE IF NOT EXISTS cache (key TEXT PRIMARY KEY, value TEXT, expires_at TEXT)")
-        conn.commit()
+    get_cache_connection().close()  # opening the cache DB ensures its schema
+
+def bulk_insert(table, cols, rows, batch=10000, verb="INSERT"):
+    """Insert many rows with one prepared statement inside a single transaction.
+    Rows are fed to executemany in chunks of `batch` to bound memory; returns rows sent.
+    `verb` may be e.g. "INSERT OR IGNORE" / "INSERT OR REPLACE".
+    """
+    sql = f"{verb} INTO {table} ({', '.join(cols)}) VALUES ({', '.join('?' * len(cols))})"
+    total = 0
+    rows = iter(rows)
+    with get_connection() as conn:  # commits once on success, rolls back on error
+        while True:
+            chunk = [tuple(r) for _, r in zip(range(batch), rows)]
+            if not chunk:
+                break
+            conn.executemany(sql, chunk)
+            total += len(chunk)
+    return total
 
 def populate_default_data():
+    # No seed tables in the current schema; use bulk_insert() when defaults are added
     pass
 
 if __name__ == "__main__":
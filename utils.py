@@ -1,81 +1,284 @@
 import os
-import sqlite3
+import re
+import threading
+import weakref
+import queue
+import atexit
+import time
+from collections import OrderedDict
 from datetime import datetime, timedelta, timezone
 import asyncio
 import logging
-from dateutil.parser import isoparse
-import requests
+import json
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+try:
+    import orjson  # optional: faster JSON log lines
+except ImportError:
+    orjson = None
 
-DB_PATH = "/data/artists.db"
+from tables import get_cache_connection
 
-def run_blocking(func, *args, **kwargs):
+# Constant SQL text so each connection's prepared-statement cache is hit on every call
+SQL_GET = "SELECT value, expires_at FROM cache WHERE key = ?"
+SQL_SET = "REPLACE INTO cache (key, value, expires_at) VALUES (?, ?, ?)"
+SQL_DEL = "DELETE FROM cache WHERE key = ?"
+SQL_CLEAR = "DELETE FROM cache"
+SQL_KEYS = "SELECT key FROM cache"
+SQL_STATS = """
+    SELECT COUNT(*),
+           SUM(CASE WHEN expires_at IS NOT NULL AND expires_at < ? THEN 1 ELSE 0 END),
+           SUM(CASE WHEN expires_at IS NOT NULL AND expires_at BETWEEN ? AND ? THEN 1 ELSE 0 END)
+    FROM cache
+"""
+SQL_PRUNE = "DELETE FROM cache WHERE expires_at IS NOT NULL AND expires_at < ?"
+
+# One long-lived cache connection per thread (run_blocking workers, background
+# refreshers) instead of connect/close on every cache call.
+_local = threading.local()
+_all_conns = weakref.WeakSet()  # live holders only, for closing at exit
+_all_conns_lock = threading.Lock()
+
+class _ConnHolder:
+    """Owns a thread's cache connection and closes it when the thread-local is
+    torn down, so short-lived threads don't leak file descriptors."""
+    __slots__ = ('conn', '__weakref__')
+
+    def __init__(self, conn):
+        self.conn = conn
+
+    def __del__(self):
+        try:
+            self.conn.close()
+        except Exception:
+            pass
+
+def _get_conn():
+    holder = getattr(_local, 'conn', None)
+    if holder is None:
+        holder = _local.conn = _ConnHolder(get_cache_connection())  # autocommit, synchronous=OFF
+        with _all_conns_lock:
+            _all_conns.add(holder)
+    return holder.conn
+
+def _close_all_conns():
+    with _all_conns_lock:
+        holders = list(_all_conns)
+        _all_conns.clear()
+    for holder in holders:
+        try:
+            holder.conn.close()
+        except Exception:
+            pass
+
+atexit.register(_close_all_conns)  # runs after flush_cache (atexit is LIFO)
+
+async def run_blocking(func, *args, **kwargs):
     """
-    Run a blocking function in an asynchronous context.
+    Run a blocking function in an asynchronous context (on the loop's default executor).
     :param func: The blocking function to run.
     :param args: Positional arguments for the function.
     :param kwargs: Keyword arguments for the function.
     :return: Result of the blocking function.
     """
-    loop = asyncio.get_event_loop()
-    return loop.run_in_executor(None, func, *args, **kwargs)
-
-
-def get_cache(key):
-    """Get a value from SQLite cache."""
-    conn = sqlite3.connect(DB_PATH)
-    cursor = conn.cursor()
-    cursor.execute("""
-        SELECT value, expires_at FROM cache WHERE key = ?
-    """, (key,))
-    result = cursor.fetchone()
-    conn.close()
-    if result:
-        value, expires_at = result
-        if expires_at and datetime.fromisoformat(expires_at) < datetime.now():
-            delete_cache(key)  # Expired, delete the key
-            return None
-        return value
-    return None
+    return await asyncio.to_thread(func, *args, **kwargs)
+
+
+# In-process LRU in front of the SQLite cache: key -> (value, expires_at epoch|None).
+# Writes land here immediately and are persisted by a background writer thread
+# that drains _write_queue in batched transactions (write-behind).
+_mem = OrderedDict()
+_MEM_MAX = 10000
+_mem_lock = threading.Lock()
+_write_queue = queue.Queue()
+_WRITE_BATCH = 200
+_writer_thread = None
+_writer_lock = threading.Lock()
+# Writes not yet committed by the writer: key -> (seq, value, expires), value _TOMB
+# for a pending delete. Unlike _mem these are never evicted, so a reader can't fall
+# through to a SQLite row that a queued write is about to replace.
+_dirty = {}
+_TOMB = object()
+_write_seq = 0
+_clear_gen = 0       # bumped by clear_all_cache; a SQLite read spanning it is discarded
+_clears_pending = 0  # queued clears: SQLite rows are already logically gone
+
+def _mem_put(key, value, expires):
+    # Caller holds _mem_lock
+    _mem[key] = (value, expires)
+    _mem.move_to_end(key)
+    while len(_mem) > _MEM_MAX:
+        _mem.popitem(last=False)
+
+def _mem_lookup(key):
+    """Return (hit, entry) for key without touching SQLite; caller holds _mem_lock.
+    A hit with entry None means the key is known to be absent."""
+    entry = _mem.get(key)
+    if entry is not None:
+        _mem.move_to_end(key)
+        return True, entry
+    pending = _dirty.get(key)
+    if pending is not None:
+        return True, (None if pending[1] is _TOMB else pending[1:])
+    if _clears_pending:
+        return True, None
+    return False, None
+
+def _enqueue_mutation(key, value, expires):
+    # Caller holds _mem_lock, so memory state and queue order always agree
+    global _write_seq
+    _write_seq += 1
+    _dirty[key] = (_write_seq, value, expires)
+    if value is _TOMB:
+        _mem.pop(key, None)
+        _enqueue_write(('del', _write_seq, key))
+    else:
+        _mem_put(key, value, expires)
+        _enqueue_write(('set', _write_seq, key, value, expires))
+
+def _settle(ops):
+    # Committed (or abandoned) ops no longer shadow SQLite, unless rewritten since
+    global _clears_pending
+    with _mem_lock:
+        for op in ops:
+            if op[0] == 'clear':
+                _clears_pending -= 1
+                continue
+            pending = _dirty.get(op[2])
+            if pending is not None and pending[0] == op[1]:
+                del _dirty[op[2]]
+
+def _cache_writer():
+    while True:
+        ops = [_write_queue.get()]
+        try:
+            while len(ops) < _WRITE_BATCH:
+                ops.append(_write_queue.get_nowait())
+        except queue.Empty:
+            pass
+        conn = None
+        try:
+            conn = _get_conn()  # inside the try: an unopenable DB must not kill the writer
+            conn.execute("BEGIN")  # one transaction per batch
+            rows = []
+            for op in ops:
+                if op[0] == 'set':
+                    rows.append(op[2:])
+                    continue
+                if op[0] == 'clear':
+                    # Sets queued before a clear would be wiped anyway; an unqualified
+                    # DELETE on a trigger/FK-free table takes SQLite's truncate path
+                    rows = []
+                    conn.execute(SQL_CLEAR)
+                    continue
+                if rows:  # keep ordering: flush pending sets before a delete
+                    conn.executemany(SQL_SET, rows)
+                    rows = []
+                if op[0] == 'del':
+                    conn.execute(SQL_DEL, (op[2],))
+            if rows:
+                conn.executemany(SQL_SET, rows)
+            conn.execute("COMMIT")
+        except Exception as e:
+            if conn is not None:
+                # Drop this thread's connection so the next batch reopens a fresh one
+                _local.conn = None
+                try:
+                    conn.close()  # rolls back any open transaction
+                except Exception:
+                    pass
+            logging.error(f"Cache write-behind batch failed ({len(ops)} ops): {e}")
+        finally:
+            _settle(ops)
+            for _ in ops:
+                _write_queue.task_done()
+
+def _enqueue_write(op):
+    global _writer_thread
+    if _writer_thread is None:
+        with _writer_lock:
+            if _writer_thread is None:
+                _writer_thread = threading.Thread(target=_cache_writer, name="cache-writer", daemon=True)
+                _writer_thread.start()
+    _write_queue.put(op)
+
+def flush_cache():
+    """Block until all queued cache writes have been persisted to SQLite."""
+    if _writer_thread is not None:
+        _write_queue.join()
+
+atexit.register(flush_cache)
+
+def get_cache(key, allow_stale=False):
+    """Get a value from the cache (in-memory LRU, then SQLite).
+    Expired rows are kept until prune_expired_cache so that allow_stale=True can
+    serve the last known value when an upstream API is unreachable.
+    """
+    with _mem_lock:
+        hit, entry = _mem_lookup(key)
+        gen = _clear_gen
+    if not hit:
+        result = _get_conn().execute(SQL_GET, (key,)).fetchone()
+        with _mem_lock:
+            if gen != _clear_gen:
+                entry = None  # cleared while we were reading
+            else:
+                hit, entry = _mem_lookup(key)
+                if not hit and result:
+                    # Promote only if no write/delete raced the read
+                    entry = tuple(result)
+                    _mem_put(key, *entry)
+    if entry is None:
+        return None
+    value, expires = entry
+    if not allow_stale and expires is not None and expires < time.time():
+        return None  # Expired (left for prune_expired_cache)
+    return value
 
 def set_cache(key, value, ttl=None):
-    """Set a value in SQLite cache with an optional TTL."""
-    expires_at = (datetime.now() + timedelta(seconds=ttl)).isoformat() if ttl else None
-    conn = sqlite3.connect(DB_PATH)
-    cursor = conn.cursor()
-    cursor.execute("""
-        REPLACE INTO cache (key, value, expires_at)
-        VALUES (?, ?, ?)
-    """, (key, value, expires_at))
-    conn.commit()
-    conn.close()
+    """Set a value in the cache with an optional TTL (persisted to SQLite in the background)."""
+    expires_at = int(time.time() + ttl) if ttl else None  # Unix epoch seconds
+    with _mem_lock:
+        _enqueue_mutation(key, value, expires_at)
 
 def delete_cache(key):
-    """Delete a value from SQLite cache."""
-    conn = sqlite3.connect(DB_PATH)
-    cursor = conn.cursor()
-    cursor.execute("""
-        DELETE FROM cache WHERE key = ?
-    """, (key,))
-    conn.commit()
-    conn.close()
+    """Delete a value from the cache (waits for SQLite so later reads can't resurrect it)."""
+    with _mem_lock:
+        _enqueue_mutation(key, _TOMB, None)
+    flush_cache()
+
+# Async entry points for coroutines: in-memory hits and set_cache never touch SQLite,
+# so only misses / clears hop to a worker thread instead of blocking the event loop.
+async def aget_cache(key, allow_stale=False):
+    with _mem_lock:
+        hit, entry = _mem_lookup(key)
+    if not hit:
+        return await asyncio.to_thread(get_cache, key, allow_stale)
+    if entry is None:
+        return None
+    value, expires = entry
+    if not allow_stale and expires is not None and expires < time.time():
+        return None
+    return value
+
+async def aset_cache(key, value, ttl=None):
+    set_cache(key, value, ttl)  # memory + write-behind queue; non-blocking
+
+async def aclear_all_cache():
+    await asyncio.to_thread(clear_all_cache)
 
 def get_cache_stats(soon_seconds: int = 600):
     """Return cache statistics: total rows, expired rows, rows expiring within soon_seconds."""
     try:
-        now = datetime.now()
-        soon_threshold = now + timedelta(seconds=soon_seconds)
-        with sqlite3.connect(DB_PATH) as conn:
-            cur = conn.cursor()
-            cur.execute("SELECT COUNT(*) FROM cache")
-            total = cur.fetchone()[0] or 0
-            cur.execute("SELECT COUNT(*) FROM cache WHERE expires_at IS NOT NULL AND expires_at < ?", (now.isoformat(),))
-            expired = cur.fetchone()[0] or 0
-            cur.execute("SELECT COUNT(*) FROM cache WHERE expires_at IS NOT NULL AND expires_at >= ? AND expires_at <= ?", (now.isoformat(), soon_threshold.isoformat()))
-            expiring_soon = cur.fetchone()[0] or 0
+        flush_cache()
+        now = int(time.time())
+        soon_threshold = now + soon_seconds
+        # One pass over the table instead of three COUNT(*) scans
+        total, expired, expiring_soon = _get_conn().execute(SQL_STATS, (now, now, soon_threshold)).fetchone()
         return {
-            'total': total,
-            'expired': expired,
-            'expiring_soon': expiring_soon,
+            'total': total or 0,
+            'expired': expired or 0,
+            'expiring_soon': expiring_soon or 0,
             'soon_window_seconds': soon_seconds
         }
     except Exception as e:
@@ -85,18 +288,23 @@ def get_cache_stats(soon_seconds: int = 600):
 # Configure logging with color-coded levels
 class CustomFormatter(logging.Formatter):
     COLORS = {
-        "DEBUG": "\033[90m",  # Gray
-        "INFO": "\033[94m",  # Blue
-        "WARNING": "\033[93m",  # Orange
-        "ERROR": "\033[91m",  # Red
-        "CRITICAL": "\033[91m",  # Red
+        logging.DEBUG: "\033[90m",  # Gray
+        logging.INFO: "\033[94m",  # Blue
+        logging.WARNING: "\033[93m",  # Orange
+        logging.ERROR: "\033[91m",  # Red
+        logging.CRITICAL: "\033[91m",  # Red
     }
     RESET = "\033[0m"
 
-    def format(self, record):
-        color = self.COLORS.get(record.levelname, self.RESET)
-        record.msg = f"{color}{record.msg}{self.RESET}"
-        return super().format(record)
+    def formatMessage(self, record):
+        # Color only the message text (not asctime/levelname); keyed by levelno, and
+        # record.msg is left untouched for other handlers
+        message = record.message
+        record.message = self.COLORS.get(record.levelno, "") + message + self.RESET
+        try:
+            return super().formatMessage(record)
+        finally:
+            record.message = message
 
 logging.basicConfig(
     level=logging.INFO,
@@ -114,59 +322,118 @@ def log_release(artist_name, release_title, platform):
     """
     logging.info(f"🎵 New release by {artist_name}: '{release_title}' on {platform}")
 
+@lru_cache(maxsize=1)
+def _isoparse():
+    """dateutil's isoparse, imported only when the fromisoformat fast path misses."""
+    from dateutil.parser import isoparse
+    return isoparse
+
+@lru_cache(maxsize=4096)
+def _parse_datetime_cached(date_str):
+    try:
+        # C fast path (3.11 accepts a trailing 'Z'); dateutil only for unusual ISO forms
+        return datetime.fromisoformat(date_str)
+    except (TypeError, ValueError):
+        pass
+    try:
+        return _isoparse()(date_str)
+    except Exception:
+        return None
+
 def parse_datetime(date_str):
     """
     Parse an ISO 8601 date string into a timezone-aware datetime object.
+    Results are memoized; timestamps repeat heavily across polling cycles.
     :param date_str: ISO 8601 date string.
     :return: A timezone-aware datetime object.
     """
     try:
-        return isoparse(date_str)
-    except Exception as e:
-        logging.error(f"Failed to parse datetime: {e}")
-        return None
+        dt = _parse_datetime_cached(date_str)
+    except TypeError:  # unhashable input
+        dt = None
+    if dt is None:
+        logging.error(f"Failed to parse datetime: {date_str!r}")
+    return dt
+
+def get_cache_keys():
+    """Return all keys currently persisted in the cache."""
+    flush_cache()
+    return [row[0] for row in _get_conn().execute(SQL_KEYS)]
 
 def clear_all_cache():
     """Clear all entries in the SQLite cache."""
-    conn = sqlite3.connect(DB_PATH)
-    cursor = conn.cursor()
-    cursor.execute("DELETE FROM cache")  # Delete all rows in the cache table
-    conn.commit()
-    conn.close()
+    global _clear_gen, _clears_pending
+    with _mem_lock:
+        _mem.clear()
+        _dirty.clear()
+        _clear_gen += 1
+        _clears_pending += 1
+        _enqueue_write(('clear',))  # Delete all rows in the cache table
+    flush_cache()
     logging.info("✅ Cleared all cache entries.")
 
-def get_highest_quality_artwork(url: str) -> str:
-    """Get highest quality version of artwork URL with fallbacks."""
-    if not url:
-        return None
-        
+# Pooled session + shared executor for artwork probes: keep-alive connections to the
+# CDNs and all variant HEADs for one URL issued concurrently. Sized for several
+# embeds resolving at once (up to 4 variants each) so callers don't queue behind each other.
+# requests is imported on first use so importing utils for the cache helpers stays cheap.
+_SESSION = None
+_session_lock = threading.Lock()
+_ART_EXECUTOR = ThreadPoolExecutor(max_workers=16, thread_name_prefix="artwork")
+
+def _get_session():
+    global _SESSION
+    if _SESSION is None:
+        with _session_lock:
+            if _SESSION is None:
+                import requests
+                from requests.adapters import HTTPAdapter
+                session = requests.Session()
+                session.mount("https://", HTTPAdapter(pool_connections=32, pool_maxsize=64))
+                _SESSION = session
+    return _SESSION
+
+def _head_ok(url: str) -> bool:
+    if get_cache(f"artcheck:{url}") == "bad":
+        return False
+    try:
+        # Bounded and no redirect chasing: a 3xx means the exact variant isn't served
+        status = _get_session().head(url, timeout=2, allow_redirects=False).status_code
+    except Exception:
+        return False  # transient; not negative-cached
+    if 400 <= status < 500 and status != 429:
+        # Definitive miss: only probe a missing variant once a day (429/5xx are transient)
+        set_cache(f"artcheck:{url}", "bad", ttl=86400)
+    return status == 200
+
+def _first_available(variants):
+    """Probe all variants concurrently; return the first (in preference order) answering 200."""
+    for variant, ok in zip(variants, _ART_EXECUTOR.map(_head_ok, variants)):
+        if ok:
+            return variant
+    return None
+
+# One C-level scan to pick the CDN, and a precompiled substitution for SoundCloud sizes
+_CDN_RE = re.compile(r'(sndcdn\.com|i\.scdn\.co)')
+_SC_LARGE = re.compile(r'-large\.')
+# SoundCloud upgrade order: original > t500x500 > large (the URL itself)
+_SC_SIZE_SUFFIXES = ("-original.", "-t500x500.", "-large.")
+
+def _cdn(url: str):
+    m = _CDN_RE.search(url)
+    return m.group(1) if m else None
+
+def _artwork_variants(url: str):
+    """Candidate artwork URLs in preference order (empty when the CDN isn't recognised)."""
+    cdn = _cdn(url)
     # For SoundCloud URLs
-    if "sndcdn.com" in url:
-        # Try upgrading in order: original > t500x500 > large > t300x300
-        variants = [
-            url.replace("-large.", "-original."),
-            url.replace("-large.", "-t500x500."),
-            url,  # Original URL as fallback
-            url.replace("-t500x500.", "-t300x300.")
-        ]
-        
+    if cdn == "sndcdn.com":
+        variants = [_SC_LARGE.sub(suffix, url) for suffix in _SC_SIZE_SUFFIXES]
+        variants.append(url.replace("-t500x500.", "-t300x300."))
         # Remove duplicates while preserving order
-        seen = set()
-        variants = [x for x in variants if not (x in seen or seen.add(x))]
-        
-        # Verify URL exists before returning
-        for variant in variants:
-            try:
-                response = requests.head(variant)
-                if response.status_code == 200:
-                    return variant
-            except:
-                continue
-                
-        return url  # Return original if no variants work
-        
+        return list(dict.fromkeys(variants))
+
     # For Spotify URLs
-    elif "i.scdn.co" in url:
+    if cdn == "i.scdn.co":
         # Handle both old and new Spotify URL formats
         try:
             if '/image/' in url:
@@ -175,65 +442,106 @@ def get_highest_quality_artwork(url: str) -> str:
             else:
                 base_url = url.rsplit('/', 1)[0] + '/'
                 spotify_id = url.split('/')[-1]
-            
             sizes = ['1000x1000', '640x640', '300x300']
-            for size in sizes:
-                high_res = f"{base_url}{size}/{spotify_id}"
-                try:
-                    response = requests.head(high_res)
-                    if response.status_code == 200:
-                        return high_res
-                except:
-                    continue
-        except:
+            return [f"{base_url}{size}/{spotify_id}" for size in sizes]
+        except Exception:
             pass
-            
-    return url  # Return original if no upgrades possible
+    return []
 
-def parse_sc_datetime(value: str):
-    """Robust SoundCloud/ISO8601 datetime parser returning aware UTC datetime or None.
-    Accepts: full timestamps with/without Z / fractional seconds, date-only strings.
+@lru_cache(maxsize=4096)
+def _probe_free_artwork(url: str) -> str:
+    if _cdn(url) == "sndcdn.com":
+        return _SC_LARGE.sub("-t500x500.", url)  # always rendered by SoundCloud's CDN
+    return url  # Spotify API images are already the 640x640 rendition
+
+class _Unconfirmed(Exception):
+    pass
+
+@lru_cache(maxsize=4096)
+def _verified_artwork(url: str) -> str:
+    variants = _artwork_variants(url)
+    if not variants:
+        return url  # no upgrades possible
+    best = _first_available(variants)
+    if best is None:
+        raise _Unconfirmed  # lru_cache doesn't memoize exceptions, so a timeout is retried
+    return best
+
+def get_highest_quality_artwork(url: str, verify: bool = False) -> str:
+    """Get highest quality version of artwork URL with fallbacks.
+    By default returns the CDN's known-good large variant without any network probe;
+    verify=True HEAD-probes the variants and picks the best one that exists. Only
+    confirmed variants are memoized; the original-URL fallback is not.
     """
-    if not value:
+    if not url:
         return None
+    if not verify:
+        return _probe_free_artwork(url)
+    try:
+        return _verified_artwork(url)
+    except _Unconfirmed:
+        return url
+
+# Forms fromisoformat rejects, notably SoundCloud's legacy "2019/05/01 10:00:00 +0000",
+# matched once and built from integer groups (no strptime format interpretation).
+_SC_DT_RE = re.compile(
+    r'(\d{4})[-/](\d{2})[-/](\d{2})(?:[T ](\d{2}):(\d{2}):(\d{2})(?:\.(\d+))?\s*(Z|[+-]\d{2}:?\d{2})?)?$'
+)
+
+def _sc_datetime_from_match(m):
+    y, mo, d, h, mi, sec, frac, tz = m.groups()
+    if h is None:
+        return datetime(int(y), int(mo), int(d), tzinfo=timezone.utc)
+    tzinfo = timezone.utc
+    if tz and tz != 'Z':
+        sign = -1 if tz[0] == '-' else 1
+        digits = tz[1:].replace(':', '')
+        tzinfo = timezone(sign * timedelta(hours=int(digits[:2]), minutes=int(digits[2:])))
+    return datetime(int(y), int(mo), int(d), int(h), int(mi), int(sec),
+                    int((frac or '0').ljust(6, '0')[:6]), tzinfo=tzinfo)
+
+@lru_cache(maxsize=4096)
+def _parse_sc_datetime_cached(value: str):
     try:
         v = value.strip()
-        # Normalize Z
-        if v.endswith('Z'):
-            v = v[:-1] + '+00:00'
-        # Date only
-        if len(v) == 10 and v.count('-') == 2:
-            return datetime.strptime(v, '%Y-%m-%d').replace(tzinfo=timezone.utc)
-        # Try common fractional / non-fractional
-        fmts = [
-            '%Y-%m-%dT%H:%M:%S%z',
-            '%Y-%m-%dT%H:%M:%S.%f%z'
-        ]
-        for fmt in fmts:
-            try:
-                return datetime.strptime(v, fmt)
-            except ValueError:
-                continue
-        # Fallback to dateutil
-        dt = isoparse(value)
+        try:
+            # C parser: date-only, Z / offsets, with or without fractional seconds (3.11+)
+            dt = datetime.fromisoformat(v)
+        except ValueError:
+            m = _SC_DT_RE.match(v)
+            # Fallback to dateutil
+            dt = _sc_datetime_from_match(m) if m else _isoparse()(value)
         if dt.tzinfo is None:
             dt = dt.replace(tzinfo=timezone.utc)
         return dt.astimezone(timezone.utc)
-    except Exception as e:
-        logging.debug(f"parse_sc_datetime failed for '{value}': {e}")
+    except Exception:
         return None
 
+def parse_sc_datetime(value: str):
+    """Robust SoundCloud/ISO8601 datetime parser returning aware UTC datetime or None.
+    Accepts: full timestamps with/without Z / fractional seconds, date-only strings.
+    Results are memoized per input string.
+    """
+    if not value:
+        return None
+    try:
+        dt = _parse_sc_datetime_cached(value)
+    except TypeError:  # unhashable input
+        dt = None
+    if dt is None:
+        logging.debug(f"parse_sc_datetime failed for '{value}'")
+    return dt
+
 def prune_expired_cache(now: datetime = None):
     """Delete expired cache rows and return count removed."""
     now = now or datetime.now()
     try:
-        with sqlite3.connect(DB_PATH) as conn:
-            cur = conn.cursor()
-            cur.execute("SELECT COUNT(*) FROM cache WHERE expires_at IS NOT NULL AND expires_at < ?", (now.isoformat(),))
-            to_remove = cur.fetchone()[0] or 0
-            cur.execute("DELETE FROM cache WHERE expires_at IS NOT NULL AND expires_at < ?", (now.isoformat(),))
-            conn.commit()
-        return to_remove
+        flush_cache()
+        cutoff = int(now.timestamp())
+        with _mem_lock:
+            for k in [k for k, (_, exp) in _mem.items() if exp is not None and exp < cutoff]:
+                del _mem[k]
+        return _get_conn().execute(SQL_PRUNE, (cutoff,)).rowcount  # exact for DELETE
     except Exception as e:
         logging.error(f"Failed pruning cache: {e}")
         return 0
@@ -241,13 +549,17 @@ def prune_expired_cache(now: datetime = None):
 # Runtime log mode switcher
 class JSONFormatter(logging.Formatter):
     def format(self, record):
-        return requests.utils.json.dumps({
-            'ts': datetime.utcnow().isoformat()+'Z',
+        payload = {
+            'ts': datetime.now(timezone.utc),
             'level': record.levelname,
             'msg': record.getMessage(),
             'logger': record.name,
             'module': record.module
-        }, ensure_ascii=False)
+        }
+        if orjson is not None:
+            return orjson.dumps(payload, option=orjson.OPT_UTC_Z).decode()
+        payload['ts'] = payload['ts'].isoformat().replace('+00:00', 'Z')
+        return json.dumps(payload, ensure_ascii=False)
 
 def set_log_mode(mode: str):
     """Switch root logger between 'json' and 'text' formats at runtime."""
@@ -256,7 +568,6 @@ def set_log_mode(mode: str):
     if mode == 'json':
         fmt = JSONFormatter()
     else:
-        from utils import CustomFormatter  # circular safe (already defined above)
         fmt = CustomFormatter('%(asctime)s %(levelname)s: %(message)s')
     for h in root.handlers:
         h.setFormatter(fmt)